@@ -1,15 +1,120 @@
+import hashlib
+import json
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from datetime import datetime
-from io import StringIO
+from io import BytesIO
+from pathlib import Path
 
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+from lxml.etree import HTMLPullParser, tostring
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from tsa_checkpoint.utils import get_args
 from tsa_checkpoint.utils.base_classes import DataExtractor
 
+# Shared keep-alive session so every year reuses one pooled connection to tsa.gov.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.3),
+    ),
+)
+
+# Keep the number of concurrent page fetches small to stay polite to tsa.gov.
+_MAX_WORKERS = 4
+
+# On-disk cache of parsed tables, revalidated with conditional GETs. Point
+# TSA_CACHE_DIR at a mounted volume so the cache outlives a throwaway container.
+_CACHE_DIR = Path(os.getenv("TSA_CACHE_DIR", Path.home() / ".cache" / "tsa"))
+_CACHE_LOCK = threading.Lock()
+
+
+def _cache_index() -> Path:
+    return _CACHE_DIR / "pages.json"
+
+
+def _read_cache_entry(url: str) -> dict | None:
+    """
+    Return the cached validators and table for a URL. The parquet file is read
+    up front so a 304 can never leave extract() without a usable table.
+    """
+    with _CACHE_LOCK:
+        if not _cache_index().exists():
+            return None
+        entry = json.loads(_cache_index().read_text()).get(url)
+    if entry is None or not Path(entry["parquet_path"]).exists():
+        return None
+    return {**entry, "df": pd.read_parquet(entry["parquet_path"])}
+
+
+def _stream_date_table(response: requests.Response) -> bytes:
+    """
+    Feed a streamed response into lxml and return the first table with a "Date"
+    cell as serialized HTML, without buffering the rest of the page.
+    """
+    parser = HTMLPullParser(events=("end",), tag="table")
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        parser.feed(chunk)
+        for _, table in parser.read_events():
+            if any(
+                "".join(cell.itertext()).strip() == "Date"
+                for cell in table.iter("th", "td")
+            ):
+                return tostring(table)
+    parser.close()
+    raise ValueError("No table with a 'Date' header found on the page.")
+
+
+def _drain(response: requests.Response):
+    """
+    Read any unconsumed body so closing the response hands its connection back
+    to the session pool instead of closing the socket. Best-effort: a body that
+    was already read, or a stream that broke, is left for close() to discard.
+    """
+    if response._content_consumed:
+        return
+    try:
+        for _ in response.iter_content(chunk_size=64 * 1024):
+            pass
+    except requests.RequestException:
+        pass
+
+
+def _write_cache_entry(url: str, response: requests.Response, df: pd.DataFrame):
+    """Persist the parsed table and the response validators for a URL."""
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag is None and last_modified is None:
+        return
+
+    _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    parquet_path = _CACHE_DIR / f"{hashlib.md5(url.encode()).hexdigest()}.parquet"
+    df.to_parquet(parquet_path, index=False)
+
+    with _CACHE_LOCK:
+        index = (
+            json.loads(_cache_index().read_text()) if _cache_index().exists() else {}
+        )
+        index[url] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "parquet_path": str(parquet_path),
+        }
+        _cache_index().write_text(json.dumps(index, indent=2))
+
 
 class TSAETL(DataExtractor):
+    __slots__ = ("current_year_str", "metadata", "url")
+
     # Configure logging.
     logging.basicConfig(
         level=logging.INFO,
@@ -21,6 +126,7 @@ class TSAETL(DataExtractor):
     logger = logging.getLogger("TSAETL")
 
     def __init__(self, year):
+        super().__init__()
         self.metadata = {
             "country": "US",
             "frequency": "daily",
@@ -29,31 +135,72 @@ class TSAETL(DataExtractor):
             "unit": "number_of",
         }
 
+        self.current_year_str = str(datetime.now().year)
         self.url = (
             self.metadata["source"]
-            if year == datetime.now().year
+            if str(year) == self.current_year_str
             else f"{self.metadata['source']}/{year}"
         )
 
     def extract(self):
         self.logger.info("Initiating the Data Extraction Method.")
 
-        response = requests.get(self.url, timeout=15)
-        response.raise_for_status()
-
-        # Parse the HTML and extract the first table.
-        soup = BeautifulSoup(response.content, "html.parser")
-        self.df = pd.read_html(StringIO(str(soup)))[0]
+        # Revalidate any cached copy so unchanged pages skip the HTML parse. The
+        # cache is only an optimization, so a broken one falls back to a full GET.
+        try:
+            cached = _read_cache_entry(self.url)
+        except (OSError, ValueError) as err:
+            self.logger.warning("Ignoring unreadable page cache: %s", err)
+            cached = None
+        headers = {}
+        if cached is not None:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        with closing(
+            _SESSION.get(self.url, headers=headers, stream=True, timeout=15)
+        ) as response:
+            try:
+                if cached is not None and response.status_code == 304:
+                    self.logger.info(
+                        "Page unchanged since the last run; using cached table."
+                    )
+                    self.df = cached["df"]
+                    return self.df
+                response.raise_for_status()
+
+                # Stream the page into lxml and keep only the table with the dates.
+                table_html = _stream_date_table(response)
+            finally:
+                _drain(response)
+
+        # The table has already been picked, so parse just that fragment.
+        tables = pd.read_html(BytesIO(table_html), flavor="lxml")
+        self.df = tables[0]
+        try:
+            _write_cache_entry(self.url, response, self.df)
+        except (OSError, ValueError) as err:
+            self.logger.warning("Could not update the page cache: %s", err)
+        return self.df
 
     def transform(self):
         self.logger.info("Initiating the Data Transformation Method.")
 
-        self.df["Date"] = pd.to_datetime(self.df["Date"], format="%m/%d/%Y").dt.date
+        # Keep datetime64 so the column maps to TIMESTAMP_NTZ in Snowflake.
+        self.df["Date"] = pd.to_datetime(
+            self.df["Date"], format="%m/%d/%Y", cache=True, errors="raise"
+        )
 
         if len(self.df.columns) > 2:
-            self.df = self.df.loc[:, ["Date", str(datetime.now().year)]]
+            keep = {"Date", self.current_year_str}
+            self.df.drop(
+                columns=[col for col in self.df.columns if col not in keep],
+                inplace=True,
+            )
             self.df.rename(
-                columns={"Date": "travel_date", str(datetime.now().year): "value"},
+                columns={"Date": "travel_date", self.current_year_str: "value"},
                 inplace=True,
             )
         else:
@@ -61,20 +208,37 @@ class TSAETL(DataExtractor):
                 columns={"Date": "travel_date", "Numbers": "value"}, inplace=True
             )
 
-        # Add SID Metadata.
-        self.df = self.df.assign(**self.metadata)
+        # Add SID Metadata, broadcasting each scalar in place.
+        for key, value in self.metadata.items():
+            self.df[key] = value
 
         # Uppercase column names for Snowflake compatibility.
         self.df.columns = self.df.columns.str.upper()
+        return self.df
 
 
 def main():
+    # Parse the CLI up front so bad arguments fail before any network work.
+    get_args()
+
     current_year = datetime.now().year
     start_year = DataExtractor.base_variables.year
 
-    for year in range(start_year, current_year + 1):
-        tsa_etl = TSAETL(year)
-        tsa_etl.etl()
+    tsa_etls = [TSAETL(year) for year in range(start_year, current_year + 1)]
+
+    # Fetch and parse every year concurrently; network I/O dominates here.
+    with closing(_SESSION), ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+        list(executor.map(lambda tsa_etl: tsa_etl.run_stage("extract"), tsa_etls))
+
+    for tsa_etl in tsa_etls:
+        tsa_etl.run_stage("transform")
+
+    # Upload every year in one batch; a single MERGE cannot dedupe its own source.
+    loader = DataExtractor()
+    loader.df = pd.concat(
+        [tsa_etl.df for tsa_etl in tsa_etls], ignore_index=True
+    ).drop_duplicates(subset=["TRAVEL_DATE"], keep="last", ignore_index=True)
+    loader.run_stage("load")
 
 
 if __name__ == "__main__":
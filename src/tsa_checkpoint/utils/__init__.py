@@ -1,25 +1,45 @@
 import argparse
 import os
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 from dopplersdk import DopplerSDK
 
-# Initialize and authenticate the SDK.
-doppler = DopplerSDK()
-doppler.set_access_token(os.getenv("DOPPLER_SERVICE_TOKEN"))
 
-secrets = doppler.secrets.list(project="tsa", config="prd").secrets
+@lru_cache(maxsize=1)
+def _get_secrets() -> dict:
+    """
+    Fetch the project secrets from Doppler once per process.
+
+    Returns:
+        dict: Secrets keyed by name, as returned by the Doppler SDK.
+    """
+    # Initialize and authenticate the SDK.
+    doppler = DopplerSDK()
+    doppler.set_access_token(os.getenv("DOPPLER_SERVICE_TOKEN"))
+    return doppler.secrets.list(project="tsa", config="prd").secrets
 
 
-class Config:
-    ACCOUNT = secrets.get("ACCOUNT", {}).get("computed")
-    USER = secrets.get("USER", {}).get("computed")
-    PASSWORD = secrets.get("PASSWORD", {}).get("computed")
-    WAREHOUSE = secrets.get("WAREHOUSE", {}).get("computed")
-    ROLE = secrets.get("ROLE", {}).get("computed")
-    DATABASE = secrets.get("DATABASE", {}).get("computed")
-    SCHEMA = secrets.get("SCHEMA", {}).get("computed")
-    TABLE = secrets.get("TABLE", {}).get("computed")
+class _LazyConfig(type):
+    def __getattr__(cls, name: str):
+        if name not in cls.KEYS:
+            raise AttributeError(name)
+        return _get_secrets().get(name, {}).get("computed")
+
+
+class Config(metaclass=_LazyConfig):
+    """Snowflake settings, resolved from Doppler on first attribute access."""
+
+    KEYS = (
+        "ACCOUNT",
+        "USER",
+        "PASSWORD",
+        "WAREHOUSE",
+        "ROLE",
+        "DATABASE",
+        "SCHEMA",
+        "TABLE",
+    )
 
 
 def parse_args() -> argparse.Namespace:
@@ -51,4 +71,12 @@ def parse_args() -> argparse.Namespace:
     return args
 
 
-parsed_args = parse_args()
+@lru_cache(maxsize=1)
+def get_args() -> argparse.Namespace:
+    """
+    Parse the command-line arguments once and reuse them on later calls.
+
+    Returns:
+        argparse.Namespace: Parsed command-line arguments.
+    """
+    return parse_args()
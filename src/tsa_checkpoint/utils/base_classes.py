@@ -1,29 +1,62 @@
+import argparse
+
 import pandas as pd
 
-from tsa_checkpoint.utils import Config, parsed_args
+from tsa_checkpoint.utils import Config, get_args
 from tsa_checkpoint.utils.snowflake_connector import SnowflakeConfig, SnowflakeConnector
 
 
 class BaseVariables:
-    arguments = parsed_args
-    environment = arguments.environment
-    prefix = arguments.sf_prefix
-    year = arguments.start_year
-    conn = {
-        "account": Config.ACCOUNT,
-        "user": Config.USER,
-        "password": Config.PASSWORD,
-        "warehouse": Config.WAREHOUSE,
-        "role": Config.ROLE,
-    }
-    database = Config.DATABASE
-    schema = Config.SCHEMA
-    table = Config.TABLE
+    __slots__ = ()
+
+    # CLI arguments and Snowflake settings are read lazily, so importing
+    # neither parses sys.argv nor calls Doppler.
+    @property
+    def arguments(self) -> argparse.Namespace:
+        return get_args()
+
+    @property
+    def environment(self) -> str:
+        return self.arguments.environment
+
+    @property
+    def prefix(self) -> str:
+        return self.arguments.sf_prefix
+
+    @property
+    def year(self) -> int:
+        return self.arguments.start_year
+
+    @property
+    def conn(self) -> dict:
+        return {
+            "account": Config.ACCOUNT,
+            "user": Config.USER,
+            "password": Config.PASSWORD,
+            "warehouse": Config.WAREHOUSE,
+            "role": Config.ROLE,
+        }
+
+    @property
+    def database(self) -> str:
+        return Config.DATABASE
+
+    @property
+    def schema(self) -> str:
+        return Config.SCHEMA
+
+    @property
+    def table(self) -> str:
+        return Config.TABLE
 
 
 class DataExtractor:
+    __slots__ = ("df",)
+
     base_variables = BaseVariables()
-    df = None
+
+    def __init__(self):
+        self.df: pd.DataFrame | None = None
 
     def extract(self) -> pd.DataFrame:
         """Extracts Data from the Source URL."""
@@ -44,21 +77,19 @@ class DataExtractor:
         snow = SnowflakeConnector(self.base_variables.conn, conf)
         snow.load_dataframe_to_snowflake(self.df)
 
-    def etl(self):
-        """Run the ETL process: Extract, Transform, Load."""
-        try:
-            self.extract()
-        except Exception as err:
-            raise RuntimeError(
-                f"Scraper failed at Extraction. Error was {err}"
-            ) from err
+    def run_stage(self, stage: str) -> None:
+        """Run a single ETL stage, wrapping any failure with the stage name."""
+        method, label = {
+            "extract": (self.extract, "Extraction"),
+            "transform": (self.transform, "Transformation"),
+            "load": (self.load, "Upload"),
+        }[stage]
         try:
-            self.transform()
+            method()
         except Exception as err:
-            raise RuntimeError(
-                f"Scraper failed at Transformation. Error was {err}"
-            ) from err
-        try:
-            self.load()
-        except Exception as err:
-            raise RuntimeError(f"Scraper failed at Upload. Error was {err}") from err
+            raise RuntimeError(f"Scraper failed at {label}. Error was {err}") from err
+
+    def etl(self):
+        """Run the ETL process: Extract, Transform, Load."""
+        for stage in ("extract", "transform", "load"):
+            self.run_stage(stage)
@@ -1,13 +1,35 @@
+import tempfile
 import textwrap
+from collections.abc import Iterator
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Union
 
 import pandas as pd
 import snowflake.connector
-from snowflake.connector.pandas_tools import write_pandas
 
+if TYPE_CHECKING:
+    import pyarrow as pa
 
-@dataclass
+# Target in-memory size of each Parquet chunk staged to Snowflake.
+CHUNK_BYTES = 100 * 1024 * 1024
+
+# Mapping from pandas dtype to Snowflake SQL types.
+_PANDAS_TO_SF = {
+    "object": "TEXT",
+    "string": "TEXT",
+    "int64": "NUMBER",
+    "Int64": "NUMBER",
+    "float64": "FLOAT",
+    "Float64": "FLOAT",
+    "bool": "BOOLEAN",
+    "boolean": "BOOLEAN",
+    "datetime64[ns]": "TIMESTAMP_NTZ",
+    "datetime64[us]": "TIMESTAMP_NTZ",
+}
+
+
+@dataclass(slots=True, frozen=True)
 class SnowflakeConfig:
     database: str
     schema: str
@@ -16,80 +38,183 @@ class SnowflakeConfig:
 
 
 class SnowflakeConnector:
+    __slots__ = ("_merge_statements", "config", "connection_params")
+
     def __init__(self, connection_params: Dict[str, Any], config: SnowflakeConfig):
         self.connection_params = connection_params
         self.config = config
+        self._merge_statements: dict[tuple[Any, ...], str] = {}
+
+    @staticmethod
+    def chunk_dataframe(df: pd.DataFrame) -> Iterator[pd.DataFrame]:
+        """
+        Split a DataFrame into row slices of roughly CHUNK_BYTES in memory each.
+        """
+        total_bytes = int(df.memory_usage(deep=True).sum())
+        rows_per_chunk = max(1, len(df) * CHUNK_BYTES // max(total_bytes, 1))
+        for start in range(0, max(len(df), 1), rows_per_chunk):
+            yield df.iloc[start : start + rows_per_chunk]
+
+    @staticmethod
+    def snowflake_type(dtype: Any) -> str:
+        """
+        Map a pandas dtype to a Snowflake SQL type, falling back to TEXT.
+        """
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            return "TIMESTAMP_LTZ"
+        return _PANDAS_TO_SF.get(str(dtype), "TEXT")
+
+    @property
+    def stage_path(self) -> str:
+        """Location in the target table's stage that holds files for one load."""
+        return f"@%{self.config.table}/load/"
+
+    @property
+    def file_format(self) -> str:
+        """Name of the session-scoped Parquet file format used to read the stage."""
+        return f"{self.config.table}_parquet"
+
+    def merge_statement(self, df: pd.DataFrame) -> str:
+        """
+        Build, or reuse, the MERGE statement that upserts the staged Parquet files.
+        """
+        key = (
+            tuple(df.columns),
+            tuple(str(dtype) for dtype in df.dtypes),
+            tuple(self.config.unique_keys),
+        )
+        if key not in self._merge_statements:
+            merge_condition = " AND ".join(
+                f'target."{col}" = source."{col}"' for col in self.config.unique_keys
+            )
+            staged_columns_list = ", ".join(
+                f'$1:"{col}"::{self.snowflake_type(dtype)} AS "{col}"'
+                for col, dtype in df.dtypes.items()
+            )
+            columns_list = ", ".join(f'"{col}"' for col in df.columns)
+            source_columns_list = ", ".join(f'source."{col}"' for col in df.columns)
+
+            self._merge_statements[key] = textwrap.dedent(
+                f"""
+                MERGE INTO {self.config.table} AS target
+                USING (
+                    SELECT {staged_columns_list}
+                    FROM {self.stage_path} (FILE_FORMAT => '{self.file_format}')
+                ) AS source
+                ON {merge_condition}
+                WHEN NOT MATCHED THEN
+                INSERT ({columns_list})
+                VALUES ({source_columns_list});
+            """
+            )
+        return self._merge_statements[key]
 
     @staticmethod
     def snowflake_create_table(table_name: str, df: pd.DataFrame) -> str:
         """
         Generate a CREATE TABLE statement for Snowflake based on DataFrame dtypes.
         """
-        # Mapping from pandas dtype to Snowflake SQL types.
-        dtype_mapping = {
-            "object": "TEXT",
-            "int64": "NUMBER",
-            "float64": "FLOAT",
-            "bool": "BOOLEAN",
-            "datetime64[ns]": "TIMESTAMP_NTZ",
-        }
         columns = [
-            f'"{col}" {dtype_mapping.get(str(dtype), "TEXT")}'
+            f'"{col}" {SnowflakeConnector.snowflake_type(dtype)}'
             for col, dtype in df.dtypes.items()
         ]
         columns_sql = ", ".join(columns)
         return f"CREATE TABLE IF NOT EXISTS {table_name} ({columns_sql});"
 
+    def migrate_text_timestamps(self, cs: Any, df: pd.DataFrame) -> None:
+        """
+        Convert timestamp columns that older loads created as TEXT to their
+        Snowflake timestamp type, rebuilding the target table in place.
+        """
+        timestamp_columns = {
+            col: self.snowflake_type(dtype)
+            for col, dtype in df.dtypes.items()
+            if self.snowflake_type(dtype).startswith("TIMESTAMP")
+        }
+        if not timestamp_columns:
+            return
+
+        cs.execute(
+            "SELECT COLUMN_NAME, DATA_TYPE FROM INFORMATION_SCHEMA.COLUMNS "
+            "WHERE TABLE_SCHEMA = CURRENT_SCHEMA() "
+            f"AND TABLE_NAME = UPPER('{self.config.table}') "
+            "ORDER BY ORDINAL_POSITION"
+        )
+        target_columns = cs.fetchall()
+        if not any(
+            col in timestamp_columns and data_type == "TEXT"
+            for col, data_type in target_columns
+        ):
+            return
+
+        # TO_TIMESTAMP_* parses both the legacy 'YYYY-MM-DD' values and any
+        # full timestamps written since, so mixed columns convert cleanly.
+        select_list = ", ".join(
+            (
+                f'TO_{timestamp_columns[col]}("{col}") AS "{col}"'
+                if col in timestamp_columns and data_type == "TEXT"
+                else f'"{col}"'
+            )
+            for col, data_type in target_columns
+        )
+        cs.execute(
+            f"CREATE OR REPLACE TABLE {self.config.table} COPY GRANTS AS "
+            f"SELECT {select_list} FROM {self.config.table}"
+        )
+
     def load_dataframe_to_snowflake(self, df: pd.DataFrame) -> None:
         """
         Load a Pandas DataFrame into Snowflake, creating required structures and inserting records.
         """
-        ctx = snowflake.connector.connect(**self.connection_params)
+        ctx = snowflake.connector.connect(
+            **{**self.connection_params, "client_session_keep_alive": True}
+        )
         try:
             with ctx.cursor() as cs:
-                # Ensure that the database and schema exist and select them.
-                cs.execute(f"CREATE DATABASE IF NOT EXISTS {self.config.database}")
-                cs.execute(f"USE DATABASE {self.config.database}")
-                cs.execute(f"CREATE SCHEMA IF NOT EXISTS {self.config.schema}")
-                cs.execute(f"USE SCHEMA {self.config.schema}")
-
-                # Create the target table if it doesn't exist.
-                cs.execute(self.snowflake_create_table(self.config.table, df))
-
-                # Create a temporary staging table with the same structure.
-                staging_table = f"{self.config.table}_staging"
+                # Ensure that the database, schema, target table and a Parquet file
+                # format exist, and clear files left behind by a failed load, in one
+                # round-trip.
+                setup_statements = [
+                    f"CREATE DATABASE IF NOT EXISTS {self.config.database}",
+                    f"USE DATABASE {self.config.database}",
+                    f"CREATE SCHEMA IF NOT EXISTS {self.config.schema}",
+                    f"USE SCHEMA {self.config.schema}",
+                    self.snowflake_create_table(self.config.table, df).rstrip(";"),
+                    (
+                        f"CREATE OR REPLACE TEMPORARY FILE FORMAT {self.file_format} "
+                        "TYPE = PARQUET USE_LOGICAL_TYPE = TRUE"
+                    ),
+                    f"REMOVE {self.stage_path}",
+                ]
                 cs.execute(
-                    f"CREATE OR REPLACE TEMPORARY TABLE {staging_table} LIKE {self.config.table}"
+                    ";\n".join(setup_statements),
+                    num_statements=len(setup_statements),
                 )
 
-                # Load the DataFrame data into the staging table.
-                success, _, nrows, _ = write_pandas(
-                    ctx, df, staging_table, quote_identifiers=False
-                )
-                if not success:
-                    raise RuntimeError(
-                        "Failed to write DataFrame to the staging table."
+                # Bring tables created before TRAVEL_DATE was typed up to date.
+                self.migrate_text_timestamps(cs, df)
+
+                # Write the DataFrame as Parquet chunks and stage them with a
+                # single PUT into the target table's stage.
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    for i, chunk in enumerate(self.chunk_dataframe(df)):
+                        chunk.to_parquet(
+                            Path(tmp_dir) / f"chunk_{i}.parquet",
+                            compression="snappy",
+                            index=False,
+                            coerce_timestamps="us",
+                            allow_truncated_timestamps=True,
+                        )
+                    cs.execute(
+                        f"PUT 'file://{Path(tmp_dir).as_posix()}/*' {self.stage_path} "
+                        "PARALLEL=4 AUTO_COMPRESS=FALSE"
                     )
+                nrows = len(df)
 
-                # Build the MERGE statement using dynamic conditions.
-                merge_condition = " AND ".join(
-                    f'target."{col}" = source."{col}"'
-                    for col in self.config.unique_keys
-                )
-                columns_list = ", ".join(f'"{col}"' for col in df.columns)
-                source_columns_list = ", ".join(f'source."{col}"' for col in df.columns)
-
-                merge_stmt = textwrap.dedent(
-                    f"""
-                    MERGE INTO {self.config.table} AS target
-                    USING {staging_table} AS source
-                    ON {merge_condition}
-                    WHEN NOT MATCHED THEN
-                    INSERT ({columns_list})
-                    VALUES ({source_columns_list});
-                """
-                )
-                cs.execute(merge_stmt)
+                # Insert staged rows whose unique keys are not yet in the table,
+                # reading the Parquet files in place, then drop the staged files.
+                cs.execute(self.merge_statement(df))
+                cs.execute(f"REMOVE {self.stage_path}")
                 ctx.commit()
                 print(
                     f"Inserted {nrows} rows into "
@@ -98,18 +223,30 @@ class SnowflakeConnector:
         finally:
             ctx.close()
 
-    def extract_dataframe_from_snowflake(self) -> pd.DataFrame:
+    def extract_dataframe_from_snowflake(
+        self, as_arrow: bool = False
+    ) -> Union[pd.DataFrame, "pa.Table"]:
         """
-        Extract data from Snowflake and return it as a Pandas DataFrame.
+        Extract data from Snowflake and return it as a Pandas DataFrame, or as a
+        PyArrow Table when `as_arrow` is set to skip the pandas conversion.
         """
         self.connection_params.update(
-            {"database": self.config.database, "schema": self.config.schema}
+            {
+                "database": self.config.database,
+                "schema": self.config.schema,
+                "client_session_keep_alive": True,
+                "arrow_number_to_decimal": False,
+            }
         )
         ctx = snowflake.connector.connect(**self.connection_params)
         try:
             with ctx.cursor() as cs:
                 cs.execute(f"SELECT * FROM {self.config.table};")
-                df = cs.fetch_pandas_all()
+                df = (
+                    cs.fetch_arrow_all(force_return_table=True)
+                    if as_arrow
+                    else cs.fetch_pandas_all()
+                )
             return df
         finally:
             ctx.close()
@@ -17,11 +17,17 @@ from tsa_checkpoint.utils.snowflake_connector import SnowflakeConfig, SnowflakeC
 def load_data(connection_params, conf):
     """Load and preprocess data from Snowflake."""
     with st.spinner("Loading Data ....."):
-        df = SnowflakeConnector(
+        table = SnowflakeConnector(
             connection_params, conf
-        ).extract_dataframe_from_snowflake()
-        df["TRAVEL_DATE"] = pd.to_datetime(df["TRAVEL_DATE"])
-        df.sort_values("TRAVEL_DATE", inplace=True)
+        ).extract_dataframe_from_snowflake(as_arrow=True)
+        # Convert the Arrow batches in one pass, releasing them as we go.
+        df = table.to_pandas(split_blocks=True, self_destruct=True)
+        del table
+        # TIMESTAMP_NTZ columns arrive as datetime64 already. Tables not yet
+        # migrated by the ETL may hold TEXT mixing dates and full timestamps.
+        if not pd.api.types.is_datetime64_any_dtype(df["TRAVEL_DATE"]):
+            df["TRAVEL_DATE"] = pd.to_datetime(df["TRAVEL_DATE"], format="ISO8601")
+        df = df.sort_values("TRAVEL_DATE", kind="mergesort", ignore_index=True)
     st.success("Loading Data ..... Successful!")
     return df
 
@@ -45,25 +51,23 @@ def plot_travel_data(df):
     st.plotly_chart(fig)
 
 
+@st.cache_data(show_spinner=False)
 def extract_metadata(df):
     """Format Metadata information from the Dataframe."""
     metadata_columns = [
         col for col in df.columns if col not in ["TRAVEL_DATE", "VALUE"]
     ]
-    metadata_dict = {
-        col: (
-            df[col].unique()[0]
-            if df[col].nunique() == 1
+    # Count distinct values for every metadata column in a single pass.
+    nunique = df[metadata_columns].nunique()
+    metadata_values = [
+        (
+            df[col].iloc[0]
+            if nunique[col] == 1
             else ", ".join(map(str, df[col].unique()))
         )
         for col in metadata_columns
-    }
-    return pd.DataFrame(
-        {
-            "Fields": list(metadata_dict.keys()),
-            "Metadata": list(metadata_dict.values()),
-        }
-    )
+    ]
+    return pd.DataFrame({"Fields": metadata_columns, "Metadata": metadata_values})
 
 
 def covid19_lockdowns():
@@ -82,12 +86,23 @@ def covid19_lockdowns():
     return lockdowns
 
 
-def forecast_prophet(df, period, lockdowns):
-    """Train the Prophet Model, Generate Forecasts, and Evaluate via Cross-Validation."""
-    df_train = df[["TRAVEL_DATE", "VALUE"]].rename(
-        columns={"TRAVEL_DATE": "ds", "VALUE": "y"}
+def prophet_frame(df):
+    """Project the travel data onto the `ds`/`y` frame that Prophet consumes."""
+    return (
+        df[["TRAVEL_DATE", "VALUE"]]
+        .rename(columns={"TRAVEL_DATE": "ds", "VALUE": "y"})
+        .astype({"y": "float64"})
     )
 
+
+def hash_dataframe(df):
+    """Hash a DataFrame by content so cached models survive Streamlit reruns."""
+    return pd.util.hash_pandas_object(df, index=False).sum()
+
+
+@st.cache_resource(show_spinner=False, hash_funcs={pd.DataFrame: hash_dataframe})
+def fit_prophet(df_train, lockdowns):
+    """Train the Prophet Model once per dataset and lockdown calendar."""
     # Initialize Prophet with Performance Optimizations.
     m = Prophet(
         seasonality_mode="multiplicative",
@@ -101,22 +116,26 @@ def forecast_prophet(df, period, lockdowns):
 
     # Fit the Model.
     m.fit(df_train)
+    return m
+
 
-    # Generate forecasts for future periods.
+def forecast_prophet(m, period):
+    """Generate forecasts for future periods from a fitted Prophet Model."""
     future = m.make_future_dataframe(periods=period)
-    forecast = m.predict(future)
+    return m.predict(future)
+
 
-    # Evaluate the Model using Cross-Validation.
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: hash_dataframe})
+def evaluate_prophet(_m, df_train):
+    """Evaluate the fitted Prophet Model on `df_train` via Cross-Validation."""
     cv_results = cross_validation(
-        m,
+        _m,
         initial="730 days",
         period="180 days",
         horizon="365 days",
         parallel="processes",
     )
-    cv_metrics = performance_metrics(cv_results)
-
-    return m, forecast, cv_metrics
+    return performance_metrics(cv_results)
 
 
 # -----------------------------------------------------------------------------
@@ -135,7 +154,7 @@ def main():
     st.title("TSA Passenger Volumes Forecasting")
 
     # Load and display data.
-    df = load_data(BaseVariables.conn, conf)
+    df = load_data(BaseVariables().conn, conf)
 
     st.subheader(":blue[TSA Travel Numbers]")
     st.markdown(
@@ -150,9 +169,14 @@ def main():
     st.markdown("**Metadata**")
     st.dataframe(meta_df, use_container_width=True, hide_index=True)
 
-    # Forecasting and Cross-Validation.
+    # Forecasting; the fit is cached so moving the slider only re-predicts.
+    if "prophet_frame" not in st.session_state:
+        st.session_state["prophet_frame"] = prophet_frame(df)
+    df_train = st.session_state["prophet_frame"]
     lockdowns = covid19_lockdowns()
-    m, forecast, _ = forecast_prophet(df, period, lockdowns)
+    with st.spinner("Fitting Forecast Model ....."):
+        m = fit_prophet(df_train, lockdowns)
+    forecast = forecast_prophet(m, period)
 
     st.subheader("Forecasting TSA Passenger Volumes")
     st.dataframe(forecast.tail(), use_container_width=True, hide_index=True)
@@ -165,6 +189,12 @@ def main():
     fig1 = m.plot_components(forecast)
     st.write(fig1)
 
+    # Cross-Validation is expensive, so only run it on request.
+    if st.checkbox("Evaluate the Model via Cross-Validation"):
+        with st.spinner("Cross-Validating ....."):
+            cv_metrics = evaluate_prophet(m, df_train)
+        st.dataframe(cv_metrics, use_container_width=True, hide_index=True)
+
 
 if __name__ == "__main__":
     main()
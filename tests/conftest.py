@@ -0,0 +1,24 @@
+import pytest
+
+from tsa_checkpoint.utils import get_args
+
+
+@pytest.fixture(autouse=True)
+def doppler_secrets(monkeypatch):
+    """Serve fake secrets so tests never reach Doppler."""
+    secrets = {
+        "DATABASE": {"computed": "TSA"},
+        "SCHEMA": {"computed": "PUBLIC"},
+        "TABLE": {"computed": "tsa_passenger_volumes"},
+    }
+    monkeypatch.setattr("tsa_checkpoint.utils._get_secrets", lambda: secrets)
+    return secrets
+
+
+@pytest.fixture(autouse=True)
+def cli_args(monkeypatch):
+    """Parse CLI defaults instead of pytest's own command line."""
+    monkeypatch.setattr("sys.argv", ["run_travel_numbers"])
+    get_args.cache_clear()
+    yield
+    get_args.cache_clear()
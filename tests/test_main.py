@@ -1,11 +1,28 @@
 from datetime import date, datetime
+from io import BytesIO
 from unittest.mock import Mock, patch
 
 import pandas as pd
 import pytest
+import requests
 from requests.exceptions import HTTPError, Timeout
 
-from tsa_checkpoint.main import TSAETL, DataExtractor, main
+from tsa_checkpoint.main import TSAETL, DataExtractor, _stream_date_table, main
+
+
+def make_response(chunks, status=200, headers=None):
+    """Build a streamable requests.Response whose body is the joined chunks."""
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response.raw = BytesIO(b"".join(chunks))
+    return response
+
+
+@pytest.fixture(autouse=True)
+def page_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr("tsa_checkpoint.main._CACHE_DIR", tmp_path)
+    return tmp_path
 
 
 @pytest.fixture
@@ -15,21 +32,21 @@ def tsa_etl():
 
 @pytest.fixture
 def sample_html():
-    return "<html><body><table><tr><td>Date</td><td>Numbers</td></tr></table></body></html>"
+    return b"<html><body><table><tr><td>Date</td><td>Numbers</td></tr></table></body></html>"
 
 
 def test_tsa_etl_init(tsa_etl):
     assert tsa_etl.url == "https://www.tsa.gov/travel/passenger-volumes"
     assert tsa_etl.metadata["country"] == "US"
     assert tsa_etl.metadata["frequency"] == "daily"
+    assert tsa_etl.df is None
+    tsa_etl.df = pd.DataFrame()
+    assert TSAETL(datetime.now().year).df is None
 
 
-@patch("requests.get")
+@patch("tsa_checkpoint.main._SESSION.get")
 def test_tsa_etl_extract_success(mock_get, tsa_etl, sample_html):
-    mock_response = Mock()
-    mock_response.raise_for_status.return_value = None
-    mock_response.content = sample_html
-    mock_get.return_value = mock_response
+    mock_get.return_value = make_response([sample_html])
 
     tsa_etl.extract()
 
@@ -37,15 +54,120 @@ def test_tsa_etl_extract_success(mock_get, tsa_etl, sample_html):
     assert tsa_etl.df.shape[1] >= 2
 
 
+def test_stream_date_table_returns_first_date_table():
+    response = Mock()
+    response.iter_content.return_value = [
+        b"<html><body><table><tr><td>Menu</td></tr></table><ta",
+        b"ble><tr><th>Date</th><th>Numbers</th></tr></table>",
+        b"<table><tr><td>Footer</td></tr></table></body></html>",
+    ]
+
+    table_html = _stream_date_table(response)
+
+    assert table_html.startswith(b"<table>")
+    assert b"<th>Date</th>" in table_html
+    assert b"Menu" not in table_html and b"Footer" not in table_html
+
+
+@patch("tsa_checkpoint.main._SESSION.get")
+def test_tsa_etl_extract_drains_rest_of_page(mock_get, tsa_etl):
+    response = make_response(
+        [
+            b"<table><tr><th><a href='?order=date'>Date</a></th><th>Numbers</th>",
+            b"</tr><tr><td>1/1/2024</td><td>100</td></tr></table>",
+            b"<footer>rest of the page</footer>" * 4096,
+        ]
+    )
+    mock_get.return_value = response
+
+    tsa_etl.extract()
+
+    assert list(tsa_etl.df.columns) == ["Date", "Numbers"]
+    assert response.raw.read() == b""
+
+
+@patch("tsa_checkpoint.main._SESSION.get")
+def test_tsa_etl_extract_without_date_table_reports_cause(mock_get, tsa_etl):
+    mock_get.return_value = make_response([b"<html><p>maintenance</p></html>"])
+
+    with pytest.raises(RuntimeError, match="No table with a 'Date' header"):
+        tsa_etl.run_stage("extract")
+
+
+@patch("tsa_checkpoint.main._SESSION.get")
+def test_tsa_etl_extract_padded_date_header(mock_get, tsa_etl):
+    mock_get.return_value = make_response(
+        [
+            b"<table><tr><th>\n  Date  </th><th>Numbers</th></tr>",
+            b"<tr><td>1/1/2024</td><td>100</td></tr></table>",
+        ]
+    )
+
+    tsa_etl.extract()
+
+    assert list(tsa_etl.df.columns) == ["Date", "Numbers"]
+
+
+@patch("tsa_checkpoint.main._SESSION.get")
+def test_tsa_etl_extract_not_modified_uses_cache(mock_get, tsa_etl):
+    mock_get.return_value = make_response(
+        [
+            b"<table><tr><th>Date</th><th>Numbers</th></tr>",
+            b"<tr><td>1/1/2024</td><td>100</td></tr></table>",
+        ],
+        headers={"ETag": '"abc123"'},
+    )
+    tsa_etl.extract()
+    expected_df = tsa_etl.df
+
+    mock_get.return_value = make_response([], status=304)
+    tsa_etl.extract()
+
+    assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"abc123"'}
+    pd.testing.assert_frame_equal(tsa_etl.df, expected_df)
+
+
+@patch("tsa_checkpoint.main._SESSION.get")
+def test_tsa_etl_extract_ignores_corrupt_cache(mock_get, tsa_etl, page_cache_dir):
+    (page_cache_dir / "pages.json").write_text("{not json")
+    mock_get.return_value = make_response(
+        [b"<table><tr><th>Date</th></tr><tr><td>1/1/2024</td></tr></table>"],
+        headers={"ETag": '"abc123"'},
+    )
+
+    tsa_etl.extract()
+
+    assert mock_get.call_args.kwargs["headers"] == {}
+    assert list(tsa_etl.df.columns) == ["Date"]
+
+
+@patch("tsa_checkpoint.main._SESSION.get")
+def test_tsa_etl_extract_survives_unwritable_cache(
+    mock_get, tsa_etl, page_cache_dir, monkeypatch
+):
+    blocker = page_cache_dir / "blocker"
+    blocker.write_text("")
+    monkeypatch.setattr("tsa_checkpoint.main._CACHE_DIR", blocker / "tsa")
+    mock_get.return_value = make_response(
+        [b"<table><tr><th>Date</th></tr><tr><td>1/1/2024</td></tr></table>"],
+        headers={"ETag": '"abc123"'},
+    )
+
+    tsa_etl.extract()
+
+    assert list(tsa_etl.df.columns) == ["Date"]
+
+
 @pytest.mark.parametrize(
     "exception,exc_class",
     [(Timeout("Timeout error"), Timeout), (HTTPError("HTTP error"), HTTPError)],
 )
-@patch("requests.get")
+@patch("tsa_checkpoint.main._SESSION.get")
 def test_tsa_etl_extract_exceptions(mock_get, tsa_etl, exception, exc_class):
     if isinstance(exception, HTTPError):
         mock_response = Mock()
         mock_response.raise_for_status.side_effect = exception
+        mock_response.iter_content.return_value = []
         mock_get.return_value = mock_response
     else:
         mock_get.side_effect = exception
@@ -76,6 +198,7 @@ def test_tsa_etl_transform_more_than_two_columns(tsa_etl):
     ]
     assert list(tsa_etl.df.columns) == expected_columns
     assert isinstance(tsa_etl.df["TRAVEL_DATE"].iloc[0], (pd.Timestamp, date))
+    assert pd.api.types.is_datetime64_any_dtype(tsa_etl.df["TRAVEL_DATE"])
 
 
 def test_tsa_etl_transform_two_columns(tsa_etl):
@@ -97,12 +220,17 @@ def test_tsa_etl_transform_two_columns(tsa_etl):
 
 
 def test_main(monkeypatch):
-    calls = []
+    loaded = []
+
+    def mock_extract(self):
+        self.df = pd.DataFrame({"TRAVEL_DATE": [self.url], "URL": [self.url]})
 
-    def mock_etl(self):
-        calls.append(self.url)
+    def mock_load(self):
+        loaded.append(self.df)
 
-    monkeypatch.setattr(TSAETL, "etl", mock_etl)
+    monkeypatch.setattr(TSAETL, "extract", mock_extract)
+    monkeypatch.setattr(TSAETL, "transform", lambda self: self.df)
+    monkeypatch.setattr(DataExtractor, "load", mock_load)
 
     main()
 
@@ -118,4 +246,5 @@ def test_main(monkeypatch):
                 f"https://www.tsa.gov/travel/passenger-volumes/{year}"
             )
 
-    assert calls == expected_calls
+    assert len(loaded) == 1
+    assert list(loaded[0]["URL"]) == expected_calls
@@ -1,4 +1,4 @@
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pandas as pd
 import pytest
@@ -38,6 +38,30 @@ def test_snowflake_create_table(snowflake_connector, sample_df):
     assert sql == expected_sql
 
 
+def test_snowflake_create_table_maps_extended_dtypes(snowflake_connector):
+    df = pd.DataFrame(
+        {
+            "ts": pd.to_datetime(["2024-01-01"]),
+            "ts_tz": pd.to_datetime(["2024-01-01"]).tz_localize("UTC"),
+            "count": pd.array([1], dtype="Int64"),
+            "label": pd.array(["a"], dtype="string"),
+        }
+    )
+    expected_sql = (
+        "CREATE TABLE IF NOT EXISTS test_table "
+        '("ts" TIMESTAMP_NTZ, "ts_tz" TIMESTAMP_LTZ, "count" NUMBER, "label" TEXT);'
+    )
+    assert snowflake_connector.snowflake_create_table("test_table", df) == expected_sql
+
+
+def test_merge_statement_is_cached(snowflake_connector, sample_df):
+    stmt = snowflake_connector.merge_statement(sample_df)
+    assert 'ON target."id" = source."id"' in stmt
+    assert '$1:"id"::NUMBER AS "id"' in stmt
+    assert "FROM @%test_table/load/ (FILE_FORMAT => 'test_table_parquet')" in stmt
+    assert snowflake_connector.merge_statement(sample_df) is stmt
+
+
 @patch("snowflake.connector.connect")
 def test_load_dataframe_to_snowflake(mock_connect, snowflake_connector, sample_df):
     mock_ctx = mock_connect.return_value
@@ -48,6 +72,57 @@ def test_load_dataframe_to_snowflake(mock_connect, snowflake_connector, sample_d
     assert mock_cs.execute.call_count >= 1
 
 
+@patch("snowflake.connector.connect")
+def test_load_dataframe_to_snowflake_batches_setup_ddl(
+    mock_connect, snowflake_connector, sample_df
+):
+    mock_cs = mock_connect.return_value.cursor.return_value.__enter__.return_value
+    snowflake_connector.load_dataframe_to_snowflake(sample_df)
+
+    setup_call = mock_cs.execute.call_args_list[0]
+    setup_sql = setup_call.args[0]
+    assert setup_call.kwargs["num_statements"] == 7
+    assert setup_sql.count(";") == 6
+    assert "CREATE OR REPLACE TEMPORARY FILE FORMAT test_table_parquet" in setup_sql
+
+
+@patch("snowflake.connector.connect")
+def test_load_dataframe_to_snowflake_stages_parquet_once(
+    mock_connect, snowflake_connector, sample_df
+):
+    mock_ctx = mock_connect.return_value
+    mock_cs = mock_ctx.cursor.return_value.__enter__.return_value
+    snowflake_connector.load_dataframe_to_snowflake(sample_df)
+
+    statements = [call.args[0] for call in mock_cs.execute.call_args_list]
+    puts = [stmt for stmt in statements if stmt.startswith("PUT 'file://")]
+    assert len(puts) == 1
+    assert "@%test_table/load/" in puts[0]
+    assert not any("COPY INTO" in stmt for stmt in statements)
+
+
+def test_migrate_text_timestamps_rebuilds_legacy_table(snowflake_connector):
+    mock_cs = Mock()
+    mock_cs.fetchall.return_value = [("ts", "TEXT"), ("id", "NUMBER")]
+    df = pd.DataFrame({"ts": pd.to_datetime(["2024-01-01"]), "id": [1]})
+
+    snowflake_connector.migrate_text_timestamps(mock_cs, df)
+
+    ctas = mock_cs.execute.call_args_list[-1].args[0]
+    assert ctas.startswith("CREATE OR REPLACE TABLE test_table COPY GRANTS AS")
+    assert 'SELECT TO_TIMESTAMP_NTZ("ts") AS "ts", "id" FROM test_table' in ctas
+
+
+def test_migrate_text_timestamps_skips_typed_table(snowflake_connector):
+    mock_cs = Mock()
+    mock_cs.fetchall.return_value = [("ts", "TIMESTAMP_NTZ"), ("id", "NUMBER")]
+    df = pd.DataFrame({"ts": pd.to_datetime(["2024-01-01"]), "id": [1]})
+
+    snowflake_connector.migrate_text_timestamps(mock_cs, df)
+
+    mock_cs.execute.assert_called_once()
+
+
 @patch("snowflake.connector.connect")
 def test_load_dataframe_to_snowflake_failure(
     mock_connect, snowflake_connector, sample_df
@@ -74,3 +149,14 @@ def test_extract_dataframe_from_snowflake(mock_connect, snowflake_connector):
     mock_ctx.cursor.assert_called_once()
     mock_cs.execute.assert_called_once()
     mock_ctx.close.assert_called_once()
+
+
+@patch("snowflake.connector.connect")
+def test_extract_dataframe_from_snowflake_as_arrow(mock_connect, snowflake_connector):
+    mock_cs = mock_connect.return_value.cursor.return_value.__enter__.return_value
+    expected_table = object()
+    mock_cs.fetch_arrow_all.return_value = expected_table
+
+    table = snowflake_connector.extract_dataframe_from_snowflake(as_arrow=True)
+    assert table is expected_table
+    mock_cs.fetch_pandas_all.assert_not_called()